@@ -2,18 +2,24 @@
 """ Star Pass Classes and Methods """
 
 # Imports - Python Standard Library
-from json import dumps, load
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from json import dump, dumps, load
 from os import getenv
 from os import path
+from types import MappingProxyType
 from typing import Any, Dict
 
 # Imports - Third-Party
 import pandas as pd
 from dotenv import load_dotenv
-from jsonschema import validate, ValidationError
-from pandas.core import frame, series
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
+from pandas.core import frame
 from pandas.core.groupby.generic import DataFrameGroupBy
-from requests import request
+from requests import RequestException, Session
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 # Load environment variables
 load_dotenv(
@@ -23,16 +29,22 @@ load_dotenv(
 
 # Constants
 GC_TOKEN = getenv(key='GC_TOKEN')
-BASE_HEADERS = {
+BASE_HEADERS = MappingProxyType({
     'Accept': 'application/json',
     'Authorization': f'Bearer {GC_TOKEN}',
     'Content-Type': 'application/json'
-}
+})
 BASE_URL = getenv(key='BASE_URL')
-DROP_COLUMNS = getenv('DROP_COLUMNS').split(
-    sep=', '
-)
 GROUP_BY_COLUMN = getenv('GROUP_BY_COLUMN')
+HTTP_MAX_WORKERS = 8
+# Retry connection errors only, since shift creation POSTs are not idempotent
+HTTP_RETRY = Retry(
+    total=3,
+    connect=3,
+    read=False,
+    status=False,
+    backoff_factor=0.5
+)
 HTTP_TIMEOUT = 3
 INPUT_FILE_EXTENSION = getenv('INPUT_FILE_EXTENSION')
 INPUT_FILE_PATH = path.join(
@@ -46,9 +58,9 @@ JSON_SCHEMA_SHIFT_FILE = path.join(
     JSON_SCHEMA_DIR,
     getenv('JSON_SCHEMA_SHIFT_FILE')
 )
-KEEP_COLUMNS = getenv('KEEP_COLUMNS').split(
-    sep=', '
-)
+KEEP_COLUMNS = [
+    column.strip() for column in getenv('KEEP_COLUMNS').split(sep=',')
+]
 OUTPUT_FILE_EXTENSION = getenv('OUTPUT_FILE_EXTENSION')
 OUTPUT_FILE_PATH = path.join(
     getenv('BASE_FILE_PATH'),
@@ -60,6 +72,54 @@ SHIFTS_DICT_KEY_NAME = getenv('SHIFTS_DICT_KEY_NAME')
 START_COLUMN = getenv('START_COLUMN')
 START_DATE_COLUMN = getenv('START_DATE_COLUMN')
 START_TIME_COLUMN = getenv('START_TIME_COLUMN')
+# Out of alphabetical order because it is built from the START_* constants
+READ_COLUMNS = [
+    GROUP_BY_COLUMN,
+    START_DATE_COLUMN,
+    START_TIME_COLUMN,
+    # 'start' is built from 'start_date' and 'start_time' after reading
+    *[column for column in KEEP_COLUMNS if column != START_COLUMN]
+]
+
+
+# Function definitions
+@cache
+def _get_shift_schema_validator() -> Validator:
+    """ Load the shift JSON Schema and build its validator once, so
+        repeated validations skip file I/O and schema checks.
+
+        Args:
+            None.
+
+        Returns:
+            shift_schema_validator (Validator):
+                JSON Schema validator for shift data.
+    """
+
+    # Load JSON Schema file for shift data
+    with open(
+        file=JSON_SCHEMA_SHIFT_FILE,
+        mode='rt',
+        encoding='utf-8'
+    ) as json_schema_shifts:
+        json_schema_shifts = load(json_schema_shifts)
+
+    # Select the validator class for the schema's '$schema' draft
+    validator_class = validator_for(
+        schema=json_schema_shifts
+    )
+
+    # Check the schema itself is valid before building the validator
+    validator_class.check_schema(
+        schema=json_schema_shifts
+    )
+
+    # Create the shift data validator
+    shift_schema_validator = validator_class(
+        schema=json_schema_shifts
+    )
+
+    return shift_schema_validator
 
 
 # Class definitions
@@ -84,20 +144,33 @@ class AmplifyShifts():
         # Set the value of self._dry_run
         self._dry_run = dry_run
 
+        # Reuse one HTTP session so API requests share pooled connections
+        # and the base headers are merged once instead of per request
+        self._session = Session()
+        self._session.headers.update(BASE_HEADERS)
+        self._session.mount(
+            prefix='https://',
+            adapter=HTTPAdapter(
+                max_retries=HTTP_RETRY,
+                # Keep a pooled connection for each concurrent request
+                pool_maxsize=HTTP_MAX_WORKERS
+            )
+        )
+
         # Placeholder variables for data transformation methods
         self._shift_data: frame.DataFrame = None
         self._grouped_shift_data: DataFrameGroupBy = None
-        self._grouped_series: series.Series = None
+        self._grouped_shifts: Dict = None
         self._shift_data: Dict = None
         self._shift_data_valid: bool = None
 
         # Call non-public functions to initialize workflow
         self._read_shift_csv_data()
-        self._remove_duplicate_shifts()
         self._format_shift_start()
         self._drop_unused_columns()
+        self._remove_duplicate_shifts()
         self._group_shift_data()
-        self._create_grouped_series()
+        self._create_grouped_shifts()
         self._create_shift_json_data()
         self._validate_shift_json_data()
 
@@ -105,11 +178,11 @@ class AmplifyShifts():
             self,
             method: str,
             url: str,
-            headers: Dict[str, str],
             json: Any,
             timeout: int
-    ) -> None:
-        """ Create base API request.
+    ) -> str:
+        """ Create base API request.  The output message is returned
+            rather than printed so the caller controls the output order.
 
             Args:
                 method (str):
@@ -118,9 +191,6 @@ class AmplifyShifts():
                 url (str):
                     Fully-qualified API endpoint URI.
 
-                headers (Dict[str, str]):
-                    HTTP headers.
-
                 json (Any):
                     JSON body.
 
@@ -128,23 +198,22 @@ class AmplifyShifts():
                     HTTP timeout.
 
             Returns:
-                None.
+                output_msg (str):
+                    HTTP API response or dry run output message.
         """
 
         # Check for a dry run
         if self._dry_run is False:
             # Send API request
-            response = request(
+            response = self._session.request(
                 method=method,
                 url=url,
-                headers=headers,
                 json=json,
                 timeout=timeout
             )
 
             # Check for HTTP errors
-            if response.ok is not True:
-                response.raise_for_status()
+            response.raise_for_status()
 
             # Set HTTP response output message
             output_msg = (
@@ -158,22 +227,24 @@ class AmplifyShifts():
                 '** HTTP API Dry Run **'
             )
 
-        # Display output message
-        print(
+        # Add request details to the output message
+        output_msg = (
             f'\n{output_msg}\n'
             f'URL: {url}\n'
             f'Shift Count: {len(json.get("shifts"))}\n'
             f'Payload:\n{dumps(json, indent=2)}'
         )
 
-        return None
+        return output_msg
 
     def _read_shift_csv_data(
         self,
         input_file: str = INPUT_FILE
     ) -> None:
         """ Read shifts data from a CSV file and convert fields to
-            strings for Amplify API compatibility.
+            strings for Amplify API compatibility.  Only the columns in
+            READ_COLUMNS are parsed, and 'need_id' is stored as a category
+            so grouping hashes integer codes instead of strings.
 
             Args:
                 input_file (str):
@@ -189,7 +260,13 @@ class AmplifyShifts():
         # Read CSV file
         shift_data = pd.read_csv(
             filepath_or_buffer=input_file,
-            dtype='string'
+            dtype='string',
+            usecols=READ_COLUMNS
+        )
+
+        # Convert the 'need_id' column to a category for grouping
+        shift_data[GROUP_BY_COLUMN] = shift_data[GROUP_BY_COLUMN].astype(
+            dtype='category'
         )
 
         # Update self._shift_data
@@ -198,11 +275,13 @@ class AmplifyShifts():
         return None
 
     def _remove_duplicate_shifts(self) -> None:
-        """ Remove duplicate shift entries.
+        """ Remove duplicate shift entries.  Runs after unused columns are
+            dropped so only the columns sent to the API are hashed.
 
             Args:
                 self._shift_data (frame.DataFrame):
-                    Pandas Data Frame of raw shift data.
+                    Pandas Data Frame of shift data without informational
+                    columns.
 
             Modifies:
                 self._shift_data (frame.DataFrame):
@@ -213,8 +292,7 @@ class AmplifyShifts():
                 None.
         """
         # Drop duplicate rows in self._shift_data
-        self._shift_data.drop_duplicates(
-            inplace=True,
+        self._shift_data = self._shift_data.drop_duplicates(
             keep='first'
         )
 
@@ -226,8 +304,7 @@ class AmplifyShifts():
 
             Args:
                 self._shift_data (frame.DataFrame):
-                    Pandas Data Frame of shift data with duplicates
-                    removed.
+                    Pandas Data Frame of raw shift data.
 
             Modifies:
                 self._shift_data (frame.DataFrame):
@@ -238,20 +315,18 @@ class AmplifyShifts():
         """
         # Add 'start' column with data from 'start_date' and 'start_time'
         self._shift_data[START_COLUMN] = self._shift_data[
-            [
-                START_DATE_COLUMN,
-                START_TIME_COLUMN
-            ]
-        ].agg(
+            START_DATE_COLUMN
+        ].str.cat(
             # Join data with a blank space separator
-            ' '.join,
-            axis=1
+            others=self._shift_data[START_TIME_COLUMN],
+            sep=' '
         )
 
         return None
 
     def _drop_unused_columns(self) -> None:
-        """ Drop unused columns from the data frame.
+        """ Drop unused columns from the data frame by selecting only the
+            'need_id' column and KEEP_COLUMNS.
 
             Args:
                 self._shift_data (frame.DataFrame):
@@ -265,20 +340,24 @@ class AmplifyShifts():
             Returns:
                 None.
         """
-        # Drop informational columns not required for an API POST request body
-        self._shift_data.drop(
-            columns=DROP_COLUMNS,
-            inplace=True
-        )
+        # Keep only the columns required for an API POST request body
+        self._shift_data = self._shift_data[
+            [
+                GROUP_BY_COLUMN,
+                *KEEP_COLUMNS
+            ]
+        ]
 
         return None
 
     def _group_shift_data(self) -> None:
-        """ Group rows by 'need_id' and keep only relevant columns.
+        """ Group rows by 'need_id'.  Only the group row positions are
+            used, so KEEP_COLUMNS are selected in _create_grouped_shifts.
 
             Args:
                 self._shift_data (frame.DataFrame):
-                    Pandas Data Frame of shift data without extra columns.
+                    Pandas Data Frame of shift data with duplicates
+                    removed.
 
             Modifies:
                 self._grouped_shift_data (DataFrameGroupBy):
@@ -288,39 +367,55 @@ class AmplifyShifts():
             Returns:
                 None.
         """
-        # Group shifts by 'need_id' and remove other columns from the POST body
+        # Group shifts by 'need_id'
+        # Group order does not matter for the API, so skip sorting 'need_id'
         self._grouped_shift_data = self._shift_data.groupby(
-            # [KEEP_COLUMNS] excludes the 'need_id' column
-            by=[GROUP_BY_COLUMN])[KEEP_COLUMNS]
+            by=GROUP_BY_COLUMN,
+            observed=True,
+            sort=False
+        )
 
         return None
 
-    def _create_grouped_series(self) -> None:
+    def _create_grouped_shifts(self) -> None:
         """ Insert a 'shifts' dict under each 'need_id' dict to comply with the
-            required API POST body request format.  Automatically converts the
-            grouped data frame to a Pandas Series
+            required API POST body request format.  Shift rows are converted
+            to dicts in a single pass and assigned to each 'need_id' using
+            the group row positions, without building a Data Frame per group.
 
             Args:
+                self._shift_data (frame.DataFrame):
+                    Pandas Data Frame of shift data with duplicates
+                    removed.
+
                 self._grouped_shift_data (DataFrameGroupBy):
                     Pandas Grouped Data Frame of shift data, grouped by each
                     shift's 'need_id'.
 
             Modifies:
-                self._grouped_series (series.Series):
-                    Pandas Series of shifts grouped by 'need_id' with all
+                self._grouped_shifts (Dict):
+                    Dictionary of shifts grouped by 'need_id' with all
                     shifts contained in a 'shifts' dict key.
 
             Returns:
                 None.
         """
+        # Convert all shift rows to dicts in a single pass
+        shift_records = self._shift_data[KEEP_COLUMNS].to_dict(
+            orient='records'
+        )
+
         # Insert a 'shifts' dict between the 'need_id' and the shift data
-        self._grouped_series = self._grouped_shift_data.apply(
-            func=lambda x: {
-                SHIFTS_DICT_KEY_NAME: x.to_dict(
-                    orient='records'
-                )
+        self._grouped_shifts = {
+            need_id: {
+                SHIFTS_DICT_KEY_NAME: [
+                    shift_records[position] for position in positions
+                ]
             }
-        )
+            for need_id, positions in (
+                self._grouped_shift_data.indices.items()
+            )
+        }
 
         return None
 
@@ -331,8 +426,8 @@ class AmplifyShifts():
         """ Create shift JSON data for the HTTP body.
 
             Args:
-                self._grouped_series (series.Series):
-                    Pandas Series of shifts grouped by 'need_id' with all
+                self._grouped_shifts (Dict):
+                    Dictionary of shifts grouped by 'need_id' with all
                     shifts contained in a 'shifts' dict key.
 
                 write_to_file (bool):
@@ -350,17 +445,21 @@ class AmplifyShifts():
                 None.
         """
 
-        if write_to_file is True:
-            # Save grouped series to JSON data to a file
-            self._grouped_series.to_json(
-                indent=2,
-                mode='w',
-                orient='index',
-                path_or_buf=OUTPUT_FILE
-            )
+        # Store grouped shift data for the HTTP body
+        self._shift_data = self._grouped_shifts
 
-        # Store grouped series data in a dictionary
-        self._shift_data = self._grouped_series.to_dict()
+        if write_to_file is True:
+            # Save the shift data dictionary to a JSON file
+            with open(
+                file=OUTPUT_FILE,
+                mode='wt',
+                encoding='utf-8'
+            ) as json_shift_data:
+                dump(
+                    obj=self._shift_data,
+                    fp=json_shift_data,
+                    indent=2
+                )
 
         return None
 
@@ -380,43 +479,21 @@ class AmplifyShifts():
                 None.
         """
 
-        # Load JSON Schema file for shift data
-        with open(
-            file=JSON_SCHEMA_SHIFT_FILE,
-            mode='rt',
-            encoding='utf-8'
-        ) as json_schema_shifts:
-            json_schema_shifts = load(json_schema_shifts)
-
-        # Validate shift data against JSON Schema
-        try:
-            # Attempt to validate shift data against JSON Schema
-            validate(
-                instance=self._shift_data,
-                schema=json_schema_shifts
-            )
-
-            # Set self._shift_data_valid to True
-            self._shift_data_valid = True
-
-        # Indicate invalidate JSON shift data
-        except ValidationError:
-            # Set self._shift_data_valid to False
-            self._shift_data_valid = False
+        # Validate shift data with the cached validator without raising
+        # a ValidationError for invalid data
+        self._shift_data_valid = _get_shift_schema_validator().is_valid(
+            instance=self._shift_data
+        )
 
         return None
 
     def create_new_shifts(
             self,
-            json: Any = None,
             timeout: int = HTTP_TIMEOUT,
     ) -> None:
         """ Upload shift data to create new Amplify shifts.
 
             Args:
-                json (Any):
-                    JSON body.
-
                 timeout (int):
                     HTTP timeout.
 
@@ -426,22 +503,50 @@ class AmplifyShifts():
 
         # Set HTTP request variables
         method = 'POST'
-        headers = BASE_HEADERS
 
-        # Create and send request
-        for need_id, shifts in self._shift_data.items():
+        # Send one request per 'need_id' concurrently
+        api_requests = {}
+        with ThreadPoolExecutor(
+            max_workers=HTTP_MAX_WORKERS
+        ) as executor:
+            for need_id, shifts in self._shift_data.items():
+                # Construct URL
+                url = f'{BASE_URL}/needs/{need_id}/shifts'
+
+                # Submit request
+                api_requests[url] = executor.submit(
+                    self._send_api_request,
+                    method=method,
+                    url=url,
+                    json=shifts,
+                    timeout=timeout
+                )
 
-            # Construct URL and JSON payload
-            url = f'{BASE_URL}/needs/{need_id}/shifts'
-            json = shifts
+        # Display the response or error for every request in 'need_id' order
+        failed_requests = []
+        for url, api_request in api_requests.items():
+            try:
+                print(api_request.result())
+
+            except RequestException as error:
+                # Keep the error and continue with the other requests
+                failed_requests.append((url, error))
+                print(
+                    '\n** HTTP API Error **\n'
+                    f'URL: {url}\n'
+                    f'Error: {error}'
+                )
 
-            # Send request
-            self._send_api_request(
-                method=method,
-                url=url,
-                headers=headers,
-                json=json,
-                timeout=timeout
+        # Raise the first error after every result is displayed, keeping its
+        # type and response for callers and noting every failed request
+        if failed_requests:
+            first_error = failed_requests[0][1]
+            first_error.add_note(
+                f'{len(failed_requests)} of {len(api_requests)} shift '
+                'requests failed:'
             )
+            for url, error in failed_requests:
+                first_error.add_note(f'{url}: {error}')
+            raise first_error
 
         return None
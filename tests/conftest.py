@@ -0,0 +1,29 @@
+""" pytest configuration for star_pass tests. """
+
+# Imports - Python Standard Library
+from os import environ, path
+
+# Constants
+REPO_ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+TEST_ENV = {
+    'BASE_FILE_NAME': '2024_june_officiating_shifts',
+    'BASE_FILE_PATH': path.join(REPO_ROOT, 'data'),
+    'BASE_URL': 'https://api.example.com/v1',
+    'GC_TOKEN': 'test-token',
+    'GROUP_BY_COLUMN': 'need_id',
+    'INPUT_FILE_DIR': 'csv',
+    'INPUT_FILE_EXTENSION': '.csv',
+    'JSON_SCHEMA_DIR': path.join(REPO_ROOT, 'app', 'schema'),
+    'JSON_SCHEMA_SHIFT_FILE': 'amplify.shifts.schema.json',
+    'KEEP_COLUMNS': 'start, duration, slots',
+    'OUTPUT_FILE_DIR': 'json',
+    'OUTPUT_FILE_EXTENSION': '.json',
+    'SHIFTS_DICT_KEY_NAME': 'shifts',
+    'START_COLUMN': 'start',
+    'START_DATE_COLUMN': 'start_date',
+    'START_TIME_COLUMN': 'start_time'
+}
+
+# Set the environment variables star_pass reads at import time
+for key, value in TEST_ENV.items():
+    environ.setdefault(key, value)
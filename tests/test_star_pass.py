@@ -0,0 +1,135 @@
+""" Tests for AmplifyShifts.create_new_shifts. """
+
+# Imports - Python Standard Library
+from unittest.mock import Mock
+
+# Imports - Third-Party
+import pytest
+from requests import HTTPError
+
+from app.star_pass import star_pass
+
+# Constants
+FAILED_NEED_ID = '628862'
+NEED_COUNT = 6
+
+
+# Function definitions
+def _mock_response(
+        method: str,
+        url: str,
+        json: dict,
+        timeout: int
+) -> Mock:
+    """ Create a mock HTTP response that fails for FAILED_NEED_ID.
+
+        Args:
+            method (str):
+                HTTP method (GET, POST, PUT, PATCH, DELETE).
+
+            url (str):
+                Fully-qualified API endpoint URI.
+
+            json (dict):
+                JSON body.
+
+            timeout (int):
+                HTTP timeout.
+
+        Returns:
+            response (Mock):
+                Mock HTTP response.
+    """
+
+    # Check the request arguments
+    assert method == 'POST'
+    assert json.get(star_pass.SHIFTS_DICT_KEY_NAME)
+    assert timeout == star_pass.HTTP_TIMEOUT
+
+    # Create a successful response
+    response = Mock(status_code=201, reason='Created')
+
+    # Fail the request for FAILED_NEED_ID
+    if url == f'{star_pass.BASE_URL}/needs/{FAILED_NEED_ID}/shifts':
+        response.status_code = 500
+        response.reason = 'Internal Server Error'
+        response.raise_for_status.side_effect = HTTPError(
+            '500 Server Error: Internal Server Error',
+            response=response
+        )
+
+    return response
+
+
+@pytest.fixture(name='session')
+def fixture_session(
+        monkeypatch: pytest.MonkeyPatch
+) -> Mock:
+    """ Replace the AmplifyShifts HTTP session with a mock session.
+
+        Args:
+            monkeypatch (pytest.MonkeyPatch):
+                pytest monkeypatch fixture.
+
+        Returns:
+            session (Mock):
+                Mock HTTP session shared by every request.
+    """
+
+    # Patch the Session class used by AmplifyShifts.__init__
+    session = Mock()
+    session.request.side_effect = _mock_response
+    monkeypatch.setattr(
+        target=star_pass,
+        name='Session',
+        value=Mock(return_value=session)
+    )
+
+    return session
+
+
+def test_create_new_shifts_dry_run(
+        capsys: pytest.CaptureFixture,
+        session: Mock
+) -> None:
+    """ A dry run displays every request without sending any. """
+
+    # Create shifts as a dry run
+    star_pass.AmplifyShifts(dry_run=True).create_new_shifts()
+
+    # Check that no requests were sent
+    session.request.assert_not_called()
+
+    # Check that every 'need_id' was displayed
+    output = capsys.readouterr().out
+    assert output.count('** HTTP API Dry Run **') == NEED_COUNT
+    assert f'/needs/{FAILED_NEED_ID}/shifts' in output
+
+
+def test_create_new_shifts_failed_need_id(
+        capsys: pytest.CaptureFixture,
+        session: Mock
+) -> None:
+    """ A failed 'need_id' does not stop the other requests, and its
+        HTTPError is raised with the failed response after every
+        result is displayed.
+    """
+
+    # Create shifts with one failed 'need_id'
+    with pytest.raises(HTTPError) as error:
+        star_pass.AmplifyShifts(dry_run=False).create_new_shifts()
+
+    # Check that every request was sent through the shared session
+    assert session.request.call_count == NEED_COUNT
+
+    # Check that the raised error keeps the failed response
+    assert error.value.response.status_code == 500
+    assert (
+        f'1 of {NEED_COUNT} shift requests failed:' in error.value.__notes__
+    )
+
+    # Check that every result was displayed
+    output = capsys.readouterr().out
+    assert output.count('** HTTP API Response **') == NEED_COUNT - 1
+    assert output.count('** HTTP API Error **') == 1
+    assert f'/needs/{FAILED_NEED_ID}/shifts' in output